@@ -9,7 +9,7 @@ import re
 import subprocess
 import sys
 from collections.abc import Callable
-from typing import Any, Iterable, Iterator, Literal, get_origin
+from typing import Any, Iterator, Literal, get_origin
 
 import griffe
 import wadler_lindig as wl
@@ -38,8 +38,16 @@ class _PublicApi:
     ):
         self._objects: set[griffe.Object] = set()
         self._toplevel_objects: set[griffe.Object] = set()
-        self._data: dict[str, list[str]] = {}
-        self._builtin_modules = builtin_modules
+        # Almost every object has a single public path, so we store just that string,
+        # and only promote it to a list if we find a second one.
+        self._data: dict[str, str | list[str]] = {}
+        # Maps module name -> whether to strip that module prefix when displaying.
+        # Builtin modules are inserted last so that they take precedence.
+        self._modules: dict[str, bool] = {}
+        for m in sys.stdlib_module_names:
+            self._modules[sys.intern(m)] = False
+        for m in builtin_modules:
+            self._modules[sys.intern(m)] = True
         for object_path in extra_public_objects:
             object_pieces = object_path.split(".")
             for i in reversed(range(1, len(object_pieces))):
@@ -52,14 +60,14 @@ class _PublicApi:
                 for object_piece in object_name:
                     object = getattr(object, object_piece)
                 private_path = f"{object.__module__}.{object.__qualname__}"
-                try:
-                    paths = self._data[private_path]
-                except KeyError:
-                    paths = self._data[private_path] = []
-                paths.append(object_path)
+                self._add_path(private_path, object_path)
         # Don't infinite loop on cycles. We only store Objects, and not Aliases, as in
         # cycles then the aliases with be distinct: `X.Y.X.Y` is not `X.Y`, though the
         # underlying object is the same.
+        # Objects are marked as seen when they are queued, not when they are popped, so
+        # that each is only expanded (and has its `all_members` computed) once, even if
+        # it is reachable through several parents. Note that griffe objects hash by
+        # identity, so `seen` is cheap.
 
         agenda: list[tuple[griffe.Object, str, bool]] = [(pkg, pkg.path, False)]
         seen: set[griffe.Object] = {pkg}
@@ -70,11 +78,7 @@ class _PublicApi:
                 # If we're in the public API, then we consider all of our children to be
                 # in it as well... (this saves us from having to parse out `filters` and
                 # `members` from our documentation)
-                try:
-                    paths = self._data[item.path]
-                except KeyError:
-                    paths = self._data[item.path] = []
-                paths.append(public_path)
+                self._add_path(item.path, public_path)
                 self._objects.add(item)
                 if toplevel_public:
                     self._toplevel_objects.add(item)
@@ -106,7 +110,17 @@ class _PublicApi:
                 agenda.append((final_member, member.path, sub_force_public))
                 seen.add(final_member)
 
-    def toplevel(self) -> Iterable[griffe.Object]:
+    def _add_path(self, private_path: str, public_path: str) -> None:
+        public_path = sys.intern(public_path)
+        paths = self._data.get(private_path)
+        if paths is None:
+            self._data[sys.intern(private_path)] = public_path
+        elif isinstance(paths, str):
+            self._data[private_path] = [paths, public_path]
+        else:
+            paths.append(public_path)
+
+    def toplevel(self) -> set[griffe.Object]:
         return self._toplevel_objects
 
     def __iter__(self) -> Iterator[griffe.Object]:
@@ -116,11 +130,18 @@ class _PublicApi:
         try:
             paths = self._data[key]
         except KeyError as e:
-            for m in self._builtin_modules:
-                if key.startswith(m + "."):
-                    return key.removeprefix(m + "."), False
-            for m in sys.stdlib_module_names:
-                if key.startswith(m + "."):
+            # Walk up through the parent modules of `key`, so that the most specific
+            # match wins, e.g. `collections.abc` over `collections`.
+            module = key
+            while "." in module:
+                module, _, _ = module.rpartition(".")
+                try:
+                    strip = self._modules[module]
+                except KeyError:
+                    continue
+                if strip:
+                    return key.removeprefix(module + "."), False
+                else:
                     return key, False
             # Note that this message must not have any newlines in it, to display
             # correctly.
@@ -133,52 +154,58 @@ class _PublicApi:
                 "`::: somelib.Foo:` with a trailing colon, when just `:::somelib.Foo` "
                 "is correct."
             ) from e
-        if len(paths) == 1:
-            return paths[0], True
+        if isinstance(paths, str):
+            return paths, True
         else:
             raise ValueError(f"{key} has multiple paths in the public API: {paths}")
 
 
-_kind_map = {
-    inspect.Parameter.POSITIONAL_ONLY: griffe.ParameterKind.positional_only,
-    inspect.Parameter.POSITIONAL_OR_KEYWORD: griffe.ParameterKind.positional_or_keyword,
-    inspect.Parameter.VAR_POSITIONAL: griffe.ParameterKind.var_positional,
-    inspect.Parameter.KEYWORD_ONLY: griffe.ParameterKind.keyword_only,
-    inspect.Parameter.VAR_KEYWORD: griffe.ParameterKind.var_keyword,
-}
+# Indexed by `inspect.Parameter.kind`, which is an `IntEnum` with values 0 to 4.
+_kinds = (
+    griffe.ParameterKind.positional_only,
+    griffe.ParameterKind.positional_or_keyword,
+    griffe.ParameterKind.var_positional,
+    griffe.ParameterKind.keyword_only,
+    griffe.ParameterKind.var_keyword,
+)
 
 
-def _pretty_annotation(
-    annotation,
-    context: dict,
-    use_public_name: Callable[[None | dict, Any], None | wl.AbstractDoc],
-):
-    if annotation is inspect.Signature.empty:
-        return None
+@ft.cache
+def _compile_annotation(annotation: str):
+    # Matching `eval`, which strips leading spaces and tabs from strings.
+    return compile(annotation.lstrip(" \t"), "<annotation>", "eval")
+
+
+def _resolve_annotation(annotation: str, context: dict) -> Any:
+    # Most string annotations are just a name or a dotted path, which we can look up
+    # directly without compiling anything.
+    pieces = annotation.split(".")
+    if all(piece.isidentifier() for piece in pieces):
+        head, *tail = pieces
+        try:
+            obj = context[head]
+        except KeyError:
+            obj = getattr(builtins, head)
+        for piece in tail:
+            obj = getattr(obj, piece)
+        return obj
     else:
-        return wl.pformat(
-            annotation, custom=ft.partial(use_public_name, context), width=9999
-        )
+        return eval(_compile_annotation(annotation), context)
 
 
-def _pretty_param(
-    param: inspect.Parameter,
-    context: dict,
-    use_public_name: Callable[[None | dict, Any], None | wl.AbstractDoc],
-) -> griffe.Parameter:
-    annotation = _pretty_annotation(param.annotation, context, use_public_name)
-    if param.default is inspect.Signature.empty:
-        default = None
+def _pretty_annotation(annotation, custom: Callable[[Any], None | wl.AbstractDoc]):
+    if annotation is inspect.Signature.empty:
+        return None
+    elif annotation is None:
+        return "None"
     else:
-        default = wl.pformat(
-            param.default, custom=ft.partial(use_public_name, None), width=9999
-        )
-    return griffe.Parameter(
-        name=param.name,
-        annotation=annotation,
-        kind=_kind_map[param.kind],
-        default=default,
-    )
+        # Fast path: most annotations are a single type or string that `custom`
+        # converts directly, in which case we can skip walking them with `wl.pformat`.
+        if isinstance(annotation, (type, str)):
+            doc = custom(annotation)
+            if isinstance(doc, wl.TextDoc):
+                return doc.text
+        return wl.pformat(annotation, custom=custom, width=9999)
 
 
 def _pretty_fn(
@@ -192,16 +219,25 @@ def _pretty_fn(
     else:
         context = module.__dict__
     signature: inspect.Signature = obj.extra["hippogriffe"]["signature"]
-    obj.parameters = griffe.Parameters(
-        *[
-            _pretty_param(param, context, use_public_name)
-            for param in signature.parameters.values()
-        ]
-    )
-    signature.return_annotation
-    obj.returns = _pretty_annotation(
-        signature.return_annotation, context, use_public_name
-    )
+    custom_annotation = ft.partial(use_public_name, context)
+    custom_default = ft.partial(use_public_name, None)
+    parameters = []
+    for param in signature.parameters.values():
+        annotation = _pretty_annotation(param.annotation, custom_annotation)
+        if param.default is inspect.Signature.empty:
+            default = None
+        else:
+            default = wl.pformat(param.default, custom=custom_default, width=9999)
+        parameters.append(
+            griffe.Parameter(
+                name=param.name,
+                annotation=annotation,
+                kind=_kinds[param.kind],
+                default=default,
+            )
+        )
+    obj.parameters = griffe.Parameters(*parameters)
+    obj.returns = _pretty_annotation(signature.return_annotation, custom_annotation)
 
 
 _builtin_re = re.compile(r"builtins\.(\w+)")
@@ -228,20 +264,50 @@ def _resolved_bases(cls: griffe.Class) -> list[str | griffe.Object]:
     return resolved_bases
 
 
-def _collect_bases(cls: griffe.Class, public_api: _PublicApi) -> dict[str, bool]:
-    bases: dict[str, bool] = {}
-    for base in _resolved_bases(cls):
-        if isinstance(base, str):
-            # builtins case above
-            bases[base] = False
-        elif isinstance(base, griffe.Class):
-            try:
-                base, autoref = public_api[base.path]
-            except _NotInPublicApiException:
-                bases.update(_collect_bases(base, public_api))
-            else:
-                bases[base] = autoref
-    return bases
+def _collect_bases(
+    cls: griffe.Class, public_api: _PublicApi, cache: dict[str, dict[str, bool]]
+) -> dict[str, bool]:
+    # `cache` maps class paths to their already-collected bases, so that shared
+    # (nonpublic) bases are only resolved once. Callers must not mutate its values.
+    try:
+        return cache[cls.path]
+    except KeyError:
+        pass
+    # We recurse into nonpublic bases using an explicit stack rather than the Python
+    # call stack, as hierarchies may be deep. Each entry is a class, the bases
+    # collected for it so far, and an iterator over its not-yet-handled bases.
+    stack: list[tuple[griffe.Class, dict[str, bool], Iterator[str | griffe.Object]]]
+    stack = [(cls, {}, iter(_resolved_bases(cls)))]
+    visiting = {cls.path}
+    while True:
+        cls, bases, remaining = stack[-1]
+        for base in remaining:
+            if isinstance(base, str):
+                # builtins case above
+                bases[base] = False
+            elif isinstance(base, griffe.Class):
+                try:
+                    public_base, autoref = public_api[base.path]
+                except _NotInPublicApiException:
+                    try:
+                        bases.update(cache[base.path])
+                    except KeyError:
+                        if base.path not in visiting:
+                            visiting.add(base.path)
+                            stack.append((base, {}, iter(_resolved_bases(base))))
+                            break
+                else:
+                    bases[public_base] = autoref
+        else:
+            # Finished with `cls`, so hand its bases back to whichever class it is a
+            # base of.
+            stack.pop()
+            visiting.remove(cls.path)
+            cache[cls.path] = bases
+            if len(stack) == 0:
+                return bases
+            _, parent_bases, _ = stack[-1]
+            parent_bases.update(bases)
 
 
 @ft.cache
@@ -290,6 +356,22 @@ def _get_repo_url(repo_url: None | str) -> tuple[pathlib.Path, str]:
     return toplevel, repo_url
 
 
+def _source_url(
+    obj: griffe.Object, toplevel: pathlib.Path, repo_url: str
+) -> None | str:
+    # Files outside of the repository (e.g. vendored dependencies) do not get a link.
+    if (
+        obj.lineno is not None
+        and obj.endlineno is not None
+        and isinstance(obj.filepath, pathlib.Path)
+        and obj.filepath.is_relative_to(toplevel)
+    ):
+        path = obj.filepath.relative_to(toplevel)
+        return repo_url.format(path=path, start=obj.lineno, end=obj.endlineno)
+    else:
+        return None
+
+
 class HippogriffeExtension(griffe.Extension):
     def __init__(
         self, config: PluginConfig, repo_url: None | str, top_level_public_api: set[str]
@@ -347,15 +429,15 @@ class HippogriffeExtension(griffe.Extension):
             extra_public_objects=self.config.extra_public_objects,
         )
 
-        def use_public_name(context: None | dict, obj: Any) -> None | wl.AbstractDoc:
+        def _use_public_name(context: None | dict, obj: Any) -> None | wl.AbstractDoc:
             # If we hit a Literal then don't try to convert any of its string-typed
             # elements into types...
             if get_origin(obj) is Literal:
                 return wl.pdoc(obj, width=9999)
             # ...but otherwise do attempt to resolve strings into types.
             if context is not None and isinstance(obj, str):
-                with contextlib.suppress(BaseException):
-                    obj = eval(obj, context)
+                with contextlib.suppress(Exception):
+                    obj = _resolve_annotation(obj, context)
             # Then if it's in the public API, convert it over.
             if (
                 isinstance(obj, type)
@@ -365,6 +447,41 @@ class HippogriffeExtension(griffe.Extension):
                 new_path, _ = public_api[f"{obj.__module__}.{obj.__qualname__}"]
                 return wl.TextDoc(new_path)
 
+        # The same handful of types and strings turn up in annotations over and over
+        # again, and resolving them against the public API is the expensive part, so
+        # cache the result for those. (Other objects are left uncached: e.g.
+        # `Literal[1, 2] == Literal[2, 1]`, but these should be displayed differently.)
+        # Contexts are module `__dict__`s, which are not hashable, so we key on their
+        # `id` -- and hold a reference to them in `contexts` so that the `id` cannot be
+        # reused.
+        contexts: dict[int, None | dict] = {}
+
+        @ft.cache
+        def _use_public_name_cached(
+            context_id: int, obj: type | str
+        ) -> None | wl.AbstractDoc:
+            return _use_public_name(contexts[context_id], obj)
+
+        def use_public_name(context: None | dict, obj: Any) -> None | wl.AbstractDoc:
+            if isinstance(obj, (type, str)):
+                try:
+                    hash(obj)
+                except Exception:
+                    pass
+                else:
+                    contexts[id(context)] = context
+                    return _use_public_name_cached(id(context), obj)
+            return _use_public_name(context, obj)
+
+        show_source_links = self.config.show_source_links
+        link_all = show_source_links == "all"
+        link_toplevel = show_source_links == "toplevel"
+        if link_all or link_toplevel:
+            toplevel, repo_url = _get_repo_url(self.repo_url)
+        else:
+            assert show_source_links == "none"
+        toplevel_objects = public_api.toplevel()
+        bases_cache: dict[str, dict[str, bool]] = {}
         for obj in public_api:
             if obj.is_function:
                 assert type(obj) is griffe.Function
@@ -392,24 +509,12 @@ class HippogriffeExtension(griffe.Extension):
                 assert type(obj) is griffe.Class
                 obj.extra["mkdocstrings"]["template"] = "hippogriffe/class.html.jinja"
                 if self.config.show_bases:
-                    public_bases = list(_collect_bases(obj, public_api).items())
+                    public_bases = list(
+                        _collect_bases(obj, public_api, bases_cache).items()
+                    )
                     obj.extra["hippogriffe"]["public_bases"] = public_bases
 
-        if self.config.show_source_links == "none":
-            api_iterable = ()
-        elif self.config.show_source_links == "toplevel":
-            api_iterable = public_api.toplevel()
-        elif self.config.show_source_links == "all":
-            api_iterable = public_api
-        else:
-            assert False
-        for obj in api_iterable:
-            if (
-                obj.lineno is not None
-                and obj.endlineno is not None
-                and isinstance(obj.filepath, pathlib.Path)
-            ):
-                toplevel, repo_url = _get_repo_url(self.repo_url)
-                path = obj.filepath.relative_to(toplevel)
-                url = repo_url.format(path=path, start=obj.lineno, end=obj.endlineno)
-                obj.extra["hippogriffe"]["url"] = url
+            if link_all or (link_toplevel and obj in toplevel_objects):
+                url = _source_url(obj, toplevel, repo_url)  # pyright: ignore[reportPossiblyUnboundVariable]
+                if url is not None:
+                    obj.extra["hippogriffe"]["url"] = url